@@ -13,6 +13,9 @@ setup(
     url="https://github.com/cumakurt/WebArchive",
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        "fast": ["orjson>=3.9.10"],
+    },
     python_requires=">=3.10",
     entry_points={
         "console_scripts": [
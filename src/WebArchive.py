@@ -32,17 +32,35 @@ import time
 import logging
 import argparse
 import configparser
-from urllib.parse import urlparse
-from functools import wraps
-from typing import List, Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Union, Any
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from prettytable import PrettyTable
 from termcolor import colored
 from tqdm import tqdm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Global logger
 logger = None
 
+# Global HTTP session
+session = None
+
+# Precompiled patterns
+_DOMAIN_RE = re.compile(r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$')
+_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+_AUTHORITY_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+\-.]*://([^/?#\s]+)', re.MULTILINE)
+_AUTHORITY_BYTES_RE = re.compile(_AUTHORITY_RE.pattern.encode('ascii'), re.MULTILINE)
+
+# Number of URL lines scanned per regex pass in extract_subdomains
+_EXTRACT_BATCH_SIZE = 10000
+
 def setup_logging(level: int = logging.INFO, log_file: str = 'webarchive.log') -> logging.Logger:
     """Setup logging configuration."""
     global logger
@@ -52,12 +70,7 @@ def setup_logging(level: int = logging.INFO, log_file: str = 'webarchive.log') -
         os.makedirs('logs', exist_ok=True)
         log_path = os.path.join('logs', log_file)
         
-        # Test if we can write to the logs directory
-        test_file = os.path.join('logs', 'test.log')
-        with open(test_file, 'w') as f:
-            f.write('test')
-        os.remove(test_file)
-        
+        # Opening the log file doubles as the write permission check
         handlers = [
             logging.FileHandler(log_path, encoding='utf-8'),
             logging.StreamHandler()
@@ -114,35 +127,37 @@ def load_config(config_file: str = 'config.ini') -> Dict[str, Any]:
 
 def validate_domain(domain: str) -> str:
     """Validate domain format."""
-    domain_pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$'
-    if not re.match(domain_pattern, domain):
+    if not _DOMAIN_RE.match(domain):
         raise ValueError(f"Invalid domain format: {domain}")
     return domain.lower()
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe file operations."""
-    return re.sub(r'[<>:"/\\|?*]', '_', filename)
+    return _FILENAME_RE.sub('_', filename)
 
-def retry_on_failure(max_retries: int = 3, delay: int = 1):
-    """Decorator for retrying failed operations."""
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(max_retries):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        logger.error(f"Final attempt failed: {e}")
-                        raise e
-                    logger.warning(f"Attempt {attempt + 1} failed: {e}, retrying in {delay}s...")
-                    time.sleep(delay)
-            return None
-        return wrapper
-    return decorator
+def setup_session(config: Dict[str, Any]) -> requests.Session:
+    """Setup HTTP session with connection pooling and retries."""
+    global session
+    
+    # Only retry on status codes here, max_retries counts total attempts;
+    # connection and streaming errors are retried in fetch_data_with_progress
+    retry = Retry(
+        total=max(0, config.get('max_retries', 3) - 1),
+        connect=0,
+        read=0,
+        backoff_factor=config.get('retry_delay', 1),
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET']
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = config.get('user_agent', 'WebArchive-Subdomain-Extractor/1.0')
+    return session
 
-@retry_on_failure(max_retries=3, delay=2)
-def fetch_data_with_progress(domain: str, config: Dict[str, Any]) -> List[str]:
+def fetch_data_with_progress(domain: str, config: Dict[str, Any]) -> List[bytes]:
     """Fetch data with progress bar and error handling."""
     params = {
         'url': f'*.{domain}/*',
@@ -152,111 +167,160 @@ def fetch_data_with_progress(domain: str, config: Dict[str, Any]) -> List[str]:
         'limit': config.get('max_results', 10000)
     }
     
-    headers = {
-        'User-Agent': config.get('user_agent', 'WebArchive-Subdomain-Extractor/1.0')
-    }
-    
     logger.info(f"Fetching data for domain: {domain}")
     print(colored(f"\nFetching data for domain: {domain}", "blue"))
     
-    try:
-        response = requests.get(
-            config['api_url'], 
-            params=params, 
-            headers=headers,
-            timeout=config.get('timeout', 30),
-            stream=True
-        )
-        response.raise_for_status()
-        
-        # Process data with progress bar
-        lines = []
-        total_lines = 0
-        
-        # First estimate line count
-        for line in response.iter_lines():
-            if line:
-                total_lines += 1
+    max_retries = max(1, config.get('max_retries', 3))
+    retry_delay = config.get('retry_delay', 1)
+    
+    # The body is streamed, so failures while reading it are retried here
+    for attempt in range(max_retries):
+        try:
+            response = (session or setup_session(config)).get(
+                config['api_url'], 
+                params=params, 
+                timeout=config.get('timeout', 30),
+                stream=True
+            )
+            response.raise_for_status()
+            
+            # Process the streamed body in a single pass with progress bar,
+            # keeping lines as bytes so the body is never decoded as a whole
+            lines = []
+            append = lines.append
+            progress = tqdm(response.iter_lines(), desc="Fetching URLs", unit="url",
+                            mininterval=0.5, miniters=500, smoothing=0.1)
+            for line in progress:
+                line = line.strip()
+                if line:
+                    append(line)
+            
+            logger.info(f"Successfully fetched {len(lines)} URLs")
+            return lines
+            
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+            if attempt == max_retries - 1:
+                logger.error(f"Failed to fetch data: {e}")
+                print(colored(f"[ERROR] Failed to fetch data: {e}", "red"))
+                raise
+            logger.warning(f"Attempt {attempt + 1} failed: {e}, retrying in {retry_delay}s...")
+            time.sleep(retry_delay)
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to fetch data: {e}")
+            print(colored(f"[ERROR] Failed to fetch data: {e}", "red"))
+            raise
+
+def build_subdomain_filter(filters: Optional[Dict[str, Any]] = None) -> Optional[Callable[[str], bool]]:
+    """Build a predicate that checks a subdomain against filter criteria."""
+    if not filters:
+        return None
+    
+    regex = re.compile(filters['regex']) if filters.get('regex') else None
+    exclude_words = [word for word in filters.get('exclude_words') or [] if word]
+    exclude_re = re.compile('|'.join(map(re.escape, exclude_words)), re.IGNORECASE) if exclude_words else None
+    min_length = filters.get('min_length')
+    max_length = filters.get('max_length')
+    
+    def matches(subdomain: str) -> bool:
+        # Regex filtering
+        if regex and not regex.search(subdomain):
+            return False
         
-        # Fetch data again and process with progress bar
-        response = requests.get(
-            config['api_url'], 
-            params=params, 
-            headers=headers,
-            timeout=config.get('timeout', 30)
-        )
-        response.raise_for_status()
+        # Length filtering
+        if min_length and len(subdomain) < min_length:
+            return False
         
-        for line in tqdm(response.text.splitlines(), desc="Fetching URLs", unit="url"):
-            if line.strip():
-                lines.append(line.strip())
+        if max_length and len(subdomain) > max_length:
+            return False
         
-        logger.info(f"Successfully fetched {len(lines)} URLs")
-        return lines
+        # Word exclusion filtering
+        if exclude_re and exclude_re.search(subdomain):
+            return False
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch data: {e}")
-        print(colored(f"[ERROR] Failed to fetch data: {e}", "red"))
-        raise
+        return True
+    
+    return matches
 
-def extract_subdomains(urls: List[str]) -> List[str]:
-    """Extract unique subdomains using proper URL parsing."""
+def extract_subdomains(urls: Union[List[str], List[bytes]],
+                       filters: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Extract unique subdomains from URL hostnames, applying filters in the same pass."""
     subdomains = set()
+    candidates = 0
+    matches = build_subdomain_filter(filters)
     
     logger.info(f"Extracting subdomains from {len(urls)} URLs")
     
-    for url in urls:
-        try:
-            # Use urllib.parse for URL parsing
-            parsed = urlparse(url)
-            hostname = parsed.netloc.split(":")[0]  # Remove port number
-            
-            # Valid hostname check
-            if hostname and '.' in hostname:
-                subdomains.add(hostname)
-                
-        except Exception as e:
-            logger.debug(f"Failed to parse URL {url}: {e}")
+    # Scan lines in bounded batches so the per-URL work runs in C while
+    # memory stays proportional to the batch size, then strip userinfo
+    # and port from the unique authorities only
+    is_bytes = bool(urls) and isinstance(urls[0], bytes)
+    authority_re, separator = (_AUTHORITY_BYTES_RE, b"\n") if is_bytes else (_AUTHORITY_RE, "\n")
+    authorities = set()
+    for start in range(0, len(urls), _EXTRACT_BATCH_SIZE):
+        authorities.update(authority_re.findall(separator.join(urls[start:start + _EXTRACT_BATCH_SIZE])))
+    if is_bytes:
+        authorities = {authority.decode('utf-8', 'replace') for authority in authorities}
+    hosts = {authority.rpartition('@')[2].partition(':')[0].lower() for authority in authorities}
+    
+    # Each unique hostname is checked and filtered only once
+    for hostname in hosts:
+        # Valid hostname check
+        if '.' not in hostname:
             continue
+        candidates += 1
+        
+        if matches is None or matches(hostname):
+            subdomains.add(hostname)
     
     result = sorted(subdomains)
+    if matches is not None:
+        logger.info(f"Filtering reduced subdomains from {candidates} to {len(result)}")
     logger.info(f"Extracted {len(result)} unique subdomains")
     return result
 
-def filter_subdomains(subdomains: List[str], filters: Optional[Dict[str, Any]] = None) -> List[str]:
-    """Filter subdomains based on criteria."""
-    if not filters:
-        return subdomains
-    
-    logger.info("Applying filters to subdomains")
-    filtered = []
-    
-    for subdomain in subdomains:
-        # Regex filtering
-        if filters.get('regex') and not re.search(filters['regex'], subdomain):
-            continue
-            
-        # Length filtering
-        if filters.get('min_length') and len(subdomain) < filters['min_length']:
-            continue
-            
-        if filters.get('max_length') and len(subdomain) > filters['max_length']:
-            continue
-            
-        # Word exclusion filtering
-        if filters.get('exclude_words'):
-            exclude_words = filters['exclude_words']
-            if any(word in subdomain.lower() for word in exclude_words):
-                continue
-                
-        filtered.append(subdomain)
-    
-    logger.info(f"Filtered subdomains: {len(filtered)} remaining")
-    return filtered
+def _save_txt(domain: str, subdomains: List[str], file_path: str):
+    """Save subdomains as plain text, one per line."""
+    with open(file_path, "w", encoding='utf-8') as f:
+        # Stream lines without a trailing separator
+        lines = iter(subdomains)
+        f.write(next(lines, ""))
+        f.writelines(f"\n{subdomain}" for subdomain in lines)
+
+def _save_json(domain: str, subdomains: List[str], file_path: str):
+    """Save subdomains as JSON with metadata."""
+    data = {
+        'domain': domain,
+        'subdomain_count': len(subdomains),
+        'extraction_date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'subdomains': subdomains
+    }
+    if orjson is not None:
+        with open(file_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(file_path, "w", encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def _save_csv(domain: str, subdomains: List[str], file_path: str):
+    """Save subdomains as CSV with index and subdomain columns."""
+    with open(file_path, "w", newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['index', 'subdomain'])
+        writer.writerows(enumerate(subdomains, 1))
+
+# Output format handlers
+_SAVE_HANDLERS = {
+    'txt': _save_txt,
+    'json': _save_json,
+    'csv': _save_csv
+}
 
 def save_results(domain: str, subdomains: List[str], output_dir: str, 
-                formats: List[str] = ['txt', 'json', 'csv']) -> Dict[str, str]:
+                formats: Optional[List[str]] = None) -> Dict[str, str]:
     """Save results in multiple formats."""
+    if formats is None:
+        formats = list(_SAVE_HANDLERS)
     base_name = sanitize_filename(domain.replace('.', '_'))
     saved_files = {}
     
@@ -265,48 +329,41 @@ def save_results(domain: str, subdomains: List[str], output_dir: str,
     
     logger.info(f"Saving results in formats: {formats}")
     
-    for fmt in formats:
+    def save_format(fmt: str) -> Optional[str]:
+        handler = _SAVE_HANDLERS.get(fmt)
+        if handler is None:
+            logger.error(f"Unsupported output format: {fmt}")
+            return None
+        
+        file_path = os.path.join(output_dir, f"{base_name}_subdomains.{fmt}")
         try:
-            if fmt == 'txt':
-                file_path = os.path.join(output_dir, f"{base_name}_subdomains.txt")
-                with open(file_path, "w", encoding='utf-8') as f:
-                    f.write("\n".join(subdomains))
-                saved_files['txt'] = file_path
-                
-            elif fmt == 'json':
-                file_path = os.path.join(output_dir, f"{base_name}_subdomains.json")
-                data = {
-                    'domain': domain,
-                    'subdomain_count': len(subdomains),
-                    'extraction_date': time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'subdomains': subdomains
-                }
-                with open(file_path, "w", encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                saved_files['json'] = file_path
-                
-            elif fmt == 'csv':
-                file_path = os.path.join(output_dir, f"{base_name}_subdomains.csv")
-                with open(file_path, "w", newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['index', 'subdomain'])
-                    for i, subdomain in enumerate(subdomains, 1):
-                        writer.writerow([i, subdomain])
-                saved_files['csv'] = file_path
-                
+            handler(domain, subdomains, file_path)
+            return file_path
         except Exception as e:
             logger.error(f"Failed to save {fmt} format: {e}")
+            return None
+    
+    # Formats are written to independent files, so write them concurrently
+    formats = list(dict.fromkeys(formats))
+    with ThreadPoolExecutor(max_workers=max(1, len(formats))) as executor:
+        for fmt, file_path in zip(formats, executor.map(save_format, formats)):
+            if file_path:
+                saved_files[fmt] = file_path
     
     return saved_files
 
-def save_raw_data(domain: str, urls: List[str], output_dir: str) -> str:
+def save_raw_data(domain: str, urls: List[bytes], output_dir: str) -> str:
     """Save raw URLs to a file."""
     base_name = sanitize_filename(domain.replace('.', '_'))
     raw_file_path = os.path.join(output_dir, f"{base_name}_raw_urls.txt")
     
     try:
-        with open(raw_file_path, "w", encoding='utf-8') as f:
-            f.write("\n".join(urls))
+        # URLs are kept as raw response bytes, so this is a plain copy
+        # streamed without a trailing separator
+        with open(raw_file_path, "wb") as f:
+            lines = iter(urls)
+            f.write(next(lines, b""))
+            f.writelines(b"\n" + url for url in lines)
         logger.info(f"Raw data saved to: {raw_file_path}")
         return raw_file_path
     except Exception as e:
@@ -353,10 +410,22 @@ def display_results(domain: str, subdomains: List[str], saved_files: Dict[str, s
     # Statistics
     if verbose:
         print(colored("\n[STATS] Statistics:", "cyan"))
-        avg_length = sum(len(s) for s in subdomains) / len(subdomains) if subdomains else 0
+        
+        # Collect length statistics in a single pass
+        total_length = 0
+        shortest = longest = subdomains[0] if subdomains else 'N/A'
+        for subdomain in subdomains:
+            length = len(subdomain)
+            total_length += length
+            if length < len(shortest):
+                shortest = subdomain
+            elif length > len(longest):
+                longest = subdomain
+        
+        avg_length = total_length / subdomain_count if subdomains else 0
         print(colored(f"       Average length: {avg_length:.1f} characters", "blue"))
-        print(colored(f"       Shortest: {min(subdomains, key=len) if subdomains else 'N/A'}", "blue"))
-        print(colored(f"       Longest: {max(subdomains, key=len) if subdomains else 'N/A'}", "blue"))
+        print(colored(f"       Shortest: {shortest}", "blue"))
+        print(colored(f"       Longest: {longest}", "blue"))
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -455,6 +524,7 @@ def main():
         # Load configuration
         config = load_config(args.config)
         config['max_results'] = args.max_results
+        setup_session(config)
         
         # Prepare filters
         filters = {}
@@ -480,18 +550,15 @@ def main():
         # Save raw data
         raw_file = save_raw_data(domain, urls, args.output_dir)
         
-        # Extract subdomains
-        subdomains = extract_subdomains(urls)
+        # Extract and filter subdomains
+        subdomains = extract_subdomains(urls, filters)
         if not subdomains:
-            print(colored("[WARNING] No subdomains could be extracted.", "yellow"))
+            if filters:
+                print(colored("[WARNING] No subdomains matched the given filters.", "yellow"))
+            else:
+                print(colored("[WARNING] No subdomains could be extracted.", "yellow"))
             sys.exit(0)
         
-        # Apply filtering
-        if filters:
-            original_count = len(subdomains)
-            subdomains = filter_subdomains(subdomains, filters)
-            logger.info(f"Filtering reduced subdomains from {original_count} to {len(subdomains)}")
-        
         # Save results
         saved_files = save_results(domain, subdomains, args.output_dir, args.format)
         